@@ -12,6 +12,8 @@ Here are manual workarounds for some common problems:
     Unfortunately canvas.draw is only way to update the display after altering the x/time axis.
     Thus every StripChartWdg will leak memory until the matplotlib bug is fixed;
     the best you can do is reduce the leak rate by increasing updateInterval.
+    Some later versions (at least 1.4 through 2.2.3) leak dead weak references in transforms;
+    StripChartWdg periodically removes those from its own transforms.
 
 - Jumping Ticks:
     By default the major time ticks and grid jump to new values as time advances. I haven't found an
@@ -73,29 +75,44 @@ History:
 2012-09-18 ROwen    Explicitly import matplotlib.dates to avoid a problem with matplotlib 1.2.0rc1
 2015-09-24 ROwen    Replace "== None" with "is None" to modernize the code.
 2015-11-03 ROwen    Replace "!= None" with "is not None" to modernize the code.
+2026-10-16 agent    Improve performance: store line data in numpy arrays, redraw lines when Tk is idle
+                    (at most maxRedrawRate times per second), draw a min/max envelope of dense data,
+                    autoscale without relim and share one time axis timer among strip charts.
+                    Added _Line.addPoints, updateConstantLine and the drawEveryN and maxRedrawRate arguments.
+                    Limit a memory leak by removing dead weak references from matplotlib transforms.
 """
 __all__ = ["StripChartWdg"]
 
-import bisect
 import datetime
+import sys
 import time
+import traceback
+import weakref
 
 import numpy
 import Tkinter
 import matplotlib
 import matplotlib.dates
+import matplotlib.ticker
+import matplotlib.transforms
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from RO.TkUtil import Timer
 
+_SecPerDay = 24 * 60 * 60
+_Inf = float("inf")
+_TransformPurgeInterval = 60.0 # interval between purges of dead matplotlib transform references (sec)
+
 class StripChartWdg(Tkinter.Frame):
     """A widget to changing values in real time as a strip chart
     
     Usage Hints:
     - For each variable quantity to display:
       - Call addLine once to specify the quantity
-      - Call addPoint for each new data point you wish to display
+      - Call addPoint on the returned object for each new data point you wish to display,
+        or addPoints to add many data points at once
 
-    - For each constant line (e.g. limit) to display call addConstantLine
+    - For each constant line (e.g. limit) to display call addConstantLine;
+      to move it later call updateConstantLine
     
     - To make sure a plot includes one or two y values (e.g. 0 or a range of values) call showY
 
@@ -126,6 +143,7 @@ class StripChartWdg(Tkinter.Frame):
         dateFormat = "%H:%M:%S",
         updateInterval = None,
         cnvTimeFunc = None,
+        maxRedrawRate = 30.0,
     ):
         """Construct a StripChartWdg with the specified time range
         
@@ -140,7 +158,13 @@ class StripChartWdg(Tkinter.Frame):
         - updateInterval: now often the time axis is updated (seconds); if None a value is calculated
         - cnvTimeFunc: a function that takes a POSIX timestamp (e.g. time.time()) and returns matplotlib days;
             typically an instance of TimeConverter; defaults to TimeConverter(useUTC=False)
+        - maxRedrawRate: maximum rate at which lines are redrawn (Hz); data arriving faster than this
+            is still recorded, but is displayed in batches
+
+        Raise ValueError if maxRedrawRate <= 0
         """
+        if maxRedrawRate <= 0:
+            raise ValueError("maxRedrawRate=%r; must be > 0" % (maxRedrawRate,))
         Tkinter.Frame.__init__(self, master)
         
         self._timeRange = timeRange
@@ -149,20 +173,19 @@ class StripChartWdg(Tkinter.Frame):
         if updateInterval is None:
             updateInterval = max(0.1, min(5.0, timeRange / 2000.0))
         self.updateInterval = float(updateInterval)
-#         print "updateInterval=", self.updateInterval
 
         if cnvTimeFunc is None:
             cnvTimeFunc = TimeConverter(useUTC=False)
         self._cnvTimeFunc = cnvTimeFunc
 
-        # how many time axis updates occur before purging old data
-        self._maxPurgeCounter = max(1, int(0.5 + (5.0 / self.updateInterval)))
-        self._purgeCounter = 0
+        # interval between purges of old data (sec)
+        self._purgeInterval = max(5.0, self.updateInterval)
 
         self.figure = matplotlib.figure.Figure(figsize=(width, height), frameon=True)
         self.canvas = FigureCanvasTkAgg(self.figure, self)
         self.canvas.get_tk_widget().grid(row=0, column=0, sticky="news")
         self.canvas.mpl_connect('draw_event', self._handleDrawEvent)
+        self.canvas.mpl_connect('resize_event', self._handleResizeEvent)
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
         bottomSubplot = self.figure.add_subplot(numSubplots, 1, numSubplots)
@@ -174,24 +197,39 @@ class StripChartWdg(Tkinter.Frame):
 
         self.xaxis = bottomSubplot.xaxis
         bottomSubplot.xaxis_date()
-        self.xaxis.set_major_formatter(matplotlib.dates.DateFormatter(dateFormat))
-
-        # dictionary of constant line name: (matplotlib Line2D, matplotlib Subplot)
-        self._constLineDict = dict()
+        if dateFormat == "%H:%M:%S" and matplotlib.rcParams["timezone"] == "UTC":
+            # equivalent to DateFormatter(dateFormat), but much faster
+            self.xaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(_formatHMS))
+        else:
+            self.xaxis.set_major_formatter(matplotlib.dates.DateFormatter(dateFormat))
 
         for subplot in self.subplotArr:
             subplot._scwLines = [] # a list of contained _Line objects;
                 # different than the standard lines property in that:
                 # - lines contains Line2D objects
                 # - lines contains constant lines as well as data lines
+            subplot._scwAnimatedConstLines = [] # constant lines (Line2D) moved by updateConstantLine
+            subplot._scwShowYSet = set() # finite y values to always show when autoscaling; see showY
             subplot._scwBackground = None # background for animation
+            subplot._scwPixelsPerData = None # (pixels per x unit, pixels per y unit) at last draw; None if unknown
             subplot.label_outer() # disable axis labels on all but the bottom subplot
             subplot.set_ylim(auto=True) # set auto scaling for the y axis
+            subplot._scwYLim = subplot.get_ylim() # cached y limits; updated by _handleYLimChanged
+            subplot._scwDoAutoscale = subplot.get_autoscaley_on() # cached for speed; see _refreshDoAutoscale
+            subplot.callbacks.connect("ylim_changed", self._handleYLimChanged)
         
+        self._dirtySubplotSet = set() # subplots whose lines have changed since they were last drawn
+        self._maxRedrawRate = float(maxRedrawRate) # maximum rate at which lines are redrawn (Hz)
+        self._lastRedrawTime = 0 # time of last redraw of lines (POSIX timestamp)
+        self._redrawTimer = Timer()
+
         self.bind("<Map>", self._handleMap)
         self.bind("<Unmap>", self._handleUnmap)
-        self._timeAxisTimer = Timer()
+        self.bind("<Destroy>", self._handleDestroy)
         self._updateTimeAxis()
+        _timeAxisScheduler.register(self)
+        self._purgeTimer = Timer(self._purgeInterval, self._purgeOldData)
+        self._transformPurgeTimer = Timer(_TransformPurgeInterval, self._purgeTransforms)
 
     def addConstantLine(self, y, subplotInd=0, **kargs):
         """Add a new constant to plot
@@ -201,20 +239,26 @@ class StripChartWdg(Tkinter.Frame):
         - subplotInd: index of subplot
         - All other keyword arguments are sent to the matplotlib Line2D constructor
           to control the appearance of the data. See addLine for more information.
+
+        Constant lines are not animated; they are drawn as part of the subplot's background,
+        which is saved once per full draw and restored under the data lines for each blit.
         """
         subplot = self.subplotArr[subplotInd]
         line2d = subplot.axhline(y, **kargs)
         yMin, yMax = subplot.get_ylim()
-        if subplot.get_autoscaley_on() and numpy.isfinite(y) and not (yMin <= y <= yMax):
-            subplot.relim()
-            subplot.autoscale_view(scalex=False, scaley=True)
+        if subplot._scwDoAutoscale and _isFinite(y) and not (yMin <= y <= yMax):
+            self._autoscaleY(subplot)
+        self.canvas.draw_idle() # update the saved background to include the new line
         return line2d
 
-    def addLine(self, subplotInd=0, **kargs):
+    def addLine(self, subplotInd=0, drawEveryN=1, **kargs):
         """Add a new quantity to plot
         
         Inputs:
         - subplotInd: index of subplot
+        - drawEveryN: redraw the line after this many points have been added
+          (but addPoint does not redraw for a point less than one pixel from the last drawn point);
+          data is always saved, but for rapidly updating lines values > 1 reduce CPU usage
         - All other keyword arguments are sent to the matplotlib Line2D constructor
           to control the appearance of the data. Useful arguments include:
           - label: name of line (displayed in a Legend)
@@ -229,6 +273,7 @@ class StripChartWdg(Tkinter.Frame):
             subplot = subplot,
             cnvTimeFunc = self._cnvTimeFunc,
             wdg = self,
+            drawEveryN = drawEveryN,
         **kargs)
     
     def clear(self):
@@ -239,7 +284,7 @@ class StripChartWdg(Tkinter.Frame):
                 line.clear()
 
     def getDoAutoscale(self, subplotInd=0):
-        return self.subplotArr[subplotInd].get_autoscaley_on()
+        return self._refreshDoAutoscale(self.subplotArr[subplotInd])
     
     def removeLine(self, line):
         """Remove an existing line added by addLine or addConstantLine
@@ -255,12 +300,12 @@ class StripChartWdg(Tkinter.Frame):
             # a constant line is just a matplotlib Line2D instance
             line2d = line
             subplot = line.axes
+            if line2d in subplot._scwAnimatedConstLines:
+                subplot._scwAnimatedConstLines.remove(line2d)
 
         subplot.lines.remove(line2d)
-        if subplot.get_autoscaley_on():
-            subplot.relim()
-            subplot.autoscale_view(scalex=False, scaley=True)
-        self.canvas.draw()
+        self._autoscaleY(subplot)
+        self.canvas.draw_idle()
 
     def setDoAutoscale(self, doAutoscale, subplotInd=0):
         """Turn autoscaling on or off for the specified subplot
@@ -270,16 +315,20 @@ class StripChartWdg(Tkinter.Frame):
         doAutoscale = bool(doAutoscale)
         subplot = self.subplotArr[subplotInd]
         subplot.set_ylim(auto=doAutoscale)
+        self._refreshDoAutoscale(subplot)
         if doAutoscale:
-            subplot.relim()
-            subplot.autoscale_view(scalex=False, scaley=True)
+            self._autoscaleY(subplot)
+            self.canvas.draw_idle()
     
     def setYLimits(self, minY, maxY, subplotInd=0):
         """Set y limits for the specified subplot and disable autoscaling.
         
         Note: if you want to autoscale with a minimum range, use showY.
         """
-        self.subplotArr[subplotInd].set_ylim(minY, maxY, auto=False)
+        subplot = self.subplotArr[subplotInd]
+        subplot.set_ylim(minY, maxY, auto=False)
+        subplot._scwDoAutoscale = False
+        self.canvas.draw_idle()
     
     def showY(self, y0, y1=None, subplotInd=0):
         """Specify one or two values to always show in the y range.
@@ -293,7 +342,7 @@ class StripChartWdg(Tkinter.Frame):
         autoscaling back on).
         """
         subplot = self.subplotArr[subplotInd]
-        yMin, yMax = subplot.get_ylim()
+        yMin, yMax = subplot._scwYLim
         
         if y1 is not None:
             yList = [y0, y1]
@@ -301,62 +350,311 @@ class StripChartWdg(Tkinter.Frame):
             yList = [y0]
         doRescale = False
         for y in yList:
-            subplot.axhline(y, linestyle=" ")
-            if subplot.get_autoscaley_on() and numpy.isfinite(y) and not (yMin <= y <= yMax):
+            if not _isFinite(y):
+                continue
+            subplot._scwShowYSet.add(y)
+            if subplot._scwDoAutoscale and not (yMin <= y <= yMax):
                 doRescale = True
         if doRescale:
-            subplot.relim()
-            subplot.autoscale_view(scalex=False, scaley=True)
+            self._autoscaleY(subplot)
+            self.canvas.draw_idle()
+
+    def updateConstantLine(self, line, y):
+        """Move a constant line added by addConstantLine to a new y value
+
+        Inputs:
+        - line: constant line, as returned by addConstantLine
+        - y: new value of constant line
+
+        The first time a line is moved it is made animated (drawn like a data line, over the saved background),
+        which requires one full redraw; after that moving the line only requires a quick blit.
+        """
+        subplot = line.axes
+        line.set_ydata([y, y])
+        if not line.get_animated():
+            line.set_animated(True)
+            subplot._scwAnimatedConstLines.append(line)
+            self.canvas.draw_idle()
+        yMin, yMax = subplot._scwYLim
+        if subplot._scwDoAutoscale and _isFinite(y) and not (yMin <= y <= yMax):
+            self._autoscaleY(subplot)
+            self.canvas.draw_idle()
+        else:
+            self._scheduleRedraw(subplot)
+
+    def _autoscaleY(self, subplot):
+        """Autoscale the y axis of the specified subplot, if autoscaling is enabled for it
+
+        This is much faster than subplot.relim() because it uses the y range cached by each data line,
+        rather than examining every data point. Constant lines are short, so their data is examined.
+        Values specified by showY are included.
+        """
+        if not self._refreshDoAutoscale(subplot):
+            return
+        if subplot._scwShowYSet:
+            yMin = min(subplot._scwShowYSet)
+            yMax = max(subplot._scwShowYSet)
+        else:
+            yMin = numpy.inf
+            yMax = -numpy.inf
+        dataLine2DSet = set()
+        for line in subplot._scwLines:
+            dataLine2DSet.add(line.line2d)
+            yMin = min(yMin, line._yMin)
+            yMax = max(yMax, line._yMax)
+        for line2d in subplot.lines:
+            if line2d in dataLine2DSet:
+                continue
+            yArr = numpy.asarray(line2d.get_ydata(), dtype=float)
+            yArr = yArr[numpy.isfinite(yArr)]
+            if len(yArr) > 0:
+                yMin = min(yMin, yArr.min())
+                yMax = max(yMax, yArr.max())
+        if yMin > yMax:
+            # no finite data; leave the limits alone
+            return
+        subplot.dataLim.intervaly = (yMin, yMax)
+        subplot.autoscale_view(scalex=False, scaley=True)
+
+    def _drawAnimatedLines(self, subplot):
+        """Draw the animated lines of a subplot: data lines and moved constant lines
+
+        The caller is responsible for restoring the background first (if needed) and blitting afterwards.
+        """
+        drawArtist = subplot.draw_artist
+        for line in subplot._scwLines:
+            line._updateLine2D()
+            drawArtist(line.line2d)
+        for line2d in subplot._scwAnimatedConstLines:
+            drawArtist(line2d)
 
     def _handleDrawEvent(self, event=None):
         """Handle draw event
+
+        Save a new background for each subplot, then draw the animated lines, which a full draw omits.
+        No blit is required, because the draw event occurs before the canvas displays the newly drawn figure.
+        This also brings all lines up to date, so pending line redraws are discarded.
         """
-#         print "handleDrawEvent"
+        self._dirtySubplotSet.clear()
         for subplot in self.subplotArr:
             subplot._scwBackground = self.canvas.copy_from_bbox(subplot.bbox)
-            for line in subplot._scwLines:
-                subplot.draw_artist(line.line2d)
-            self.canvas.blit(subplot.bbox)
+            viewLim = subplot.viewLim
+            if viewLim.width != 0 and viewLim.height != 0:
+                subplot._scwPixelsPerData = (
+                    abs(subplot.bbox.width / viewLim.width),
+                    abs(subplot.bbox.height / viewLim.height),
+                )
+            else:
+                subplot._scwPixelsPerData = None
+            self._drawAnimatedLines(subplot)
     
+    def _redrawDirtySubplots(self):
+        """Redraw the lines of each subplot whose lines have changed since they were last drawn
+
+        If more than one subplot is redrawn then the whole figure is blitted once,
+        rather than blitting each subplot separately.
+        """
+        self._lastRedrawTime = time.time()
+        dirtySubplotSet, self._dirtySubplotSet = self._dirtySubplotSet, set()
+        redrawnSubplotList = []
+        for subplot in self.subplotArr:
+            if subplot not in dirtySubplotSet or not subplot._scwBackground:
+                continue
+            self.canvas.restore_region(subplot._scwBackground)
+            self._drawAnimatedLines(subplot)
+            redrawnSubplotList.append(subplot)
+        if len(redrawnSubplotList) == 1:
+            self.canvas.blit(redrawnSubplotList[0].bbox)
+        elif redrawnSubplotList:
+            self.canvas.blit(self.figure.bbox)
+
+    def _scheduleRedraw(self, subplot):
+        """Schedule a redraw of the lines in the specified subplot
+
+        The redraw occurs when Tk is next idle, but no sooner than 1/_maxRedrawRate seconds
+        after the previous redraw. Thus adding many points at once (e.g. to several lines in one subplot)
+        results in one redraw per subplot, and data arriving faster than the eye can follow
+        does not waste time on redraws.
+        """
+        self._dirtySubplotSet.add(subplot)
+        if not self._redrawTimer.isActive:
+            delay = max(0.0, self._lastRedrawTime + (1.0 / self._maxRedrawRate) - time.time())
+            self._redrawTimer.start(delay, self._redrawDirtySubplots)
+
+    def _handleYLimChanged(self, subplot):
+        """Handle a change to the y limits of a subplot
+
+        Also called when autoscaling is turned on or off using subplot.set_ylim(auto=...).
+        """
+        subplot._scwYLim = subplot.get_ylim()
+        self._refreshDoAutoscale(subplot)
+
+    def _refreshDoAutoscale(self, subplot):
+        """Update the cached autoscale flag of a subplot from matplotlib and return it
+
+        The cache is used when adding data, but subplot.set_autoscaley_on does not
+        report the change, so the cache may be stale until this is called.
+        """
+        doAutoscale = subplot.get_autoscaley_on()
+        if doAutoscale and not subplot._scwDoAutoscale:
+            # lines do not track their y range while autoscaling is off
+            for line in subplot._scwLines:
+                line._updateYRange()
+        subplot._scwDoAutoscale = doAutoscale
+        return doAutoscale
+
+    def _handleResizeEvent(self, event=None):
+        """Handle resize event
+
+        The saved backgrounds no longer match the canvas, so discard them;
+        the draw event that follows the resize saves new ones.
+        """
+        for subplot in self.subplotArr:
+            subplot._scwBackground = None
+            for line in subplot._scwLines:
+                # the number of pixels has changed, so the displayed data may need to change
+                line._line2DIsCurrent = False
+
+    def _getPurgeMplDays(self):
+        """Return the time before which data may be purged (matplotlib days)
+        """
+        return self._cnvTimeFunc(time.time() + self.updateInterval - self._timeRange)
+
+    def _handleDestroy(self, evt):
+        """Handle destroy event: stop all timers
+        """
+        _timeAxisScheduler.unregister(self)
+        self._purgeTimer.cancel()
+        self._transformPurgeTimer.cancel()
+        self._redrawTimer.cancel()
+
     def _handleMap(self, evt):
         """Handle map event (widget made visible)
         """
         self._isVisible = True
-        self._handleDrawEvent()
-        self._updateTimeAxis()
+        # data added while not visible may be out of range
+        for subplot in self.subplotArr:
+            self._autoscaleY(subplot)
+        self._updateTimeAxis() # requests a draw, which triggers _handleDrawEvent
     
     def _handleUnmap(self, evt):
         """Handle unmap event (widget made not visible)
         """
         self._isVisible = False
+
+    def _isViewable(self):
+        """Return True if the widget can be seen
+
+        Unlike _isVisible this is False if an ancestor is unmapped (e.g. the window is iconified),
+        but it requires a call to Tk, so use it sparingly.
+        """
+        return self._isVisible and bool(self.winfo_viewable())
     
+    def _purgeOldData(self):
+        """Purge data that is older than the time range and autoscale y accordingly; calls itself
+        """
+        minMplDays = self._getPurgeMplDays()
+        for subplot in self.subplotArr:
+            for line in subplot._scwLines:
+                line._purgeOldData(minMplDays)
+
+        if self._isViewable():
+            yLimChanged = False
+            for subplot in self.subplotArr:
+                # since data has been purged the y limits may have changed
+                oldYLim = subplot._scwYLim
+                self._autoscaleY(subplot)
+                if subplot._scwYLim != oldYLim:
+                    yLimChanged = True
+            if yLimChanged:
+                self.canvas.draw_idle()
+        self._purgeTimer.start(self._purgeInterval, self._purgeOldData)
+
+    def _purgeTransforms(self):
+        """Remove dead weak references from the matplotlib transforms of this widget; calls itself
+        """
+        transformList = [self.figure.transFigure, self.figure.bbox]
+        for subplot in self.subplotArr:
+            transformList += [subplot.transData, subplot.transAxes, subplot.viewLim, subplot.dataLim, subplot.bbox]
+        _purgeDeadTransformRefs(transformList)
+        self._transformPurgeTimer.start(_TransformPurgeInterval, self._purgeTransforms)
+
     def _updateTimeAxis(self):
-        """Update the time axis; calls itself
+        """Update the time axis; called every updateInterval seconds by _timeAxisScheduler
         """
         tMax = time.time() + self.updateInterval
         tMin = tMax - self._timeRange
         minMplDays = self._cnvTimeFunc(tMin)
         maxMplDays = self._cnvTimeFunc(tMax)
         
-        self._purgeCounter = (self._purgeCounter + 1) % self._maxPurgeCounter
-        doPurge = self._purgeCounter == 0
-
-        if doPurge:
-            for subplot in self.subplotArr:
-                for line in subplot._scwLines:
-                    line._purgeOldData(minMplDays)
-        
-        if self._isVisible or self._isFirst:
+        if self._isFirst or self._isViewable():
             for subplot in self.subplotArr:
                 subplot.set_xlim(minMplDays, maxMplDays)
-                if doPurge:
-                    if subplot.get_autoscaley_on():
-                        # since data is being purged the y limits may have changed
-                        subplot.relim()
-                        subplot.autoscale_view(scalex=False, scaley=True)
             self._isFirst = False
-            self.canvas.draw()
-        self._timeAxisTimer.start(self.updateInterval, self._updateTimeAxis)
+            self.canvas.draw_idle()
+
+
+class _TimeAxisScheduler(object):
+    """Periodically update the time axis of strip chart widgets
+
+    Uses one timer for all strip charts that have the same updateInterval,
+    rather than one timer per strip chart.
+
+    Strip charts are weakly referenced, so a strip chart that is garbage collected
+    is automatically unregistered; a strip chart whose widget has been destroyed
+    is unregistered at its next update.
+    """
+    def __init__(self):
+        self._chartSetDict = dict() # dict of updateInterval: weakref.WeakSet of StripChartWdg
+        self._timerDict = dict() # dict of updateInterval: Timer
+
+    def register(self, stripChart):
+        """Start calling stripChart._updateTimeAxis every stripChart.updateInterval seconds
+        """
+        updateInterval = stripChart.updateInterval
+        chartSet = self._chartSetDict.get(updateInterval)
+        if chartSet is None:
+            chartSet = weakref.WeakSet()
+            self._chartSetDict[updateInterval] = chartSet
+            self._timerDict[updateInterval] = Timer()
+        chartSet.add(stripChart)
+        timer = self._timerDict[updateInterval]
+        if not timer.isActive:
+            timer.start(updateInterval, self._update, updateInterval)
+
+    def unregister(self, stripChart):
+        """Stop updating the time axis of stripChart; a no-op if not registered
+        """
+        chartSet = self._chartSetDict.get(stripChart.updateInterval)
+        if chartSet is not None:
+            chartSet.discard(stripChart)
+
+    def _update(self, updateInterval):
+        """Update the time axis of all strip charts with the specified updateInterval; calls itself
+
+        An error updating one strip chart is reported and does not prevent updating the others.
+        """
+        chartSet = self._chartSetDict[updateInterval]
+        for stripChart in list(chartSet):
+            try:
+                if not stripChart.winfo_exists():
+                    chartSet.discard(stripChart)
+                    continue
+            except Tkinter.TclError:
+                chartSet.discard(stripChart)
+                continue
+            try:
+                stripChart._updateTimeAxis()
+            except Exception as e:
+                sys.stderr.write("StripChartWdg time axis update failed: %s\n" % (e,))
+                traceback.print_exc(file=sys.stderr)
+        if chartSet:
+            self._timerDict[updateInterval].start(updateInterval, self._update, updateInterval)
+        else:
+            del self._chartSetDict[updateInterval]
+            del self._timerDict[updateInterval]
+
+_timeAxisScheduler = _TimeAxisScheduler()
 
 
 class _Line(object):
@@ -368,7 +666,8 @@ class _Line(object):
     - cnvTimeFunc: a function that takes a POSIX timestamp (e.g. time.time()) and returns matplotlib days;
         typically an instance of TimeConverter; defaults to TimeConverter(useUTC=False)
     """
-    def __init__(self, subplot, cnvTimeFunc, wdg, **kargs):
+    _MinBufSize = 100 # minimum number of points allocated for data
+    def __init__(self, subplot, cnvTimeFunc, wdg, drawEveryN=1, **kargs):
         """Create a line
         
         Inputs:
@@ -376,15 +675,28 @@ class _Line(object):
         - cnvTimeFunc: a function that takes a POSIX timestamp (e.g. time.time()) and returns matplotlib days;
             typically an instance of TimeConverter; defaults to TimeConverter(useUTC=False)
         - wdg: parent strip chart widget; used to test visibility
+        - drawEveryN: redraw the line after this many points have been added
+            (but addPoint does not redraw for a point less than one pixel from the last drawn point)
         - **kargs: keyword arguments for matplotlib Line2D, such as color
         """
         self.subplot = subplot
         self._cnvTimeFunc = cnvTimeFunc
         self._wdg = wdg
-        # do not use the data in the Line2D because in some versions of matplotlib
-        # line.get_data returns numpy arrays, which cannot be appended to
-        self._tList = []
-        self._yList = []
+        self._drawEveryN = max(1, int(drawEveryN))
+        self._numUndrawn = 0 # number of points added since the line was last redrawn
+        self._lastDrawnPoint = None # (mplDays, y) of last point when the line was last redrawn; None if none
+        # data is kept in arrays with room to spare, so adding a point rarely allocates memory;
+        # the valid data is [self._headInd:self._tailInd]; see _makeRoom for details
+        bufSize = max(self._MinBufSize, int(wdg._timeRange / wdg.updateInterval))
+        self._tArr = numpy.zeros(bufSize, dtype=float)
+        self._yArr = numpy.zeros(bufSize, dtype=float)
+        self._headInd = 0
+        self._tailInd = 0
+        self._line2DIsCurrent = True # is the data in line2d up to date? see _updateLine2D
+        # range of finite y values in the valid data (inf, -inf if none); used for autoscaling,
+        # and so only kept up to date while the subplot is autoscaling
+        self._yMin = numpy.inf
+        self._yMax = -numpy.inf
         self.line2d = matplotlib.lines.Line2D([], [], animated=True, **kargs)
         self.subplot.add_line(self.line2d)
         self.subplot._scwLines.append(self)
@@ -402,42 +714,185 @@ class _Line(object):
             t = time.time()
         mplDays = self._cnvTimeFunc(t)
 
-        self._tList.append(mplDays)
-        self._yList.append(y)
-        self._redraw()
+        if self._tailInd >= len(self._tArr):
+            self._makeRoom(1)
+        self._tArr[self._tailInd] = mplDays
+        self._yArr[self._tailInd] = y
+        self._tailInd += 1
+        if self.subplot._scwDoAutoscale and _isFinite(y):
+            if y < self._yMin:
+                self._yMin = y
+            if y > self._yMax:
+                self._yMax = y
+        self._numUndrawn += 1
+        if self._numUndrawn >= self._drawEveryN and self._isVisiblyNew(mplDays, y):
+            self._redraw()
+
+    def _isVisiblyNew(self, mplDays, y):
+        """Return True if a new point is at least one pixel away from the last drawn point (or if unsure)
+
+        Inputs:
+        - mplDays: time of new point (matplotlib days)
+        - y: y value of new point
+        """
+        pixelsPerData = self.subplot._scwPixelsPerData
+        if pixelsPerData is None or self._lastDrawnPoint is None:
+            return True
+        lastMplDays, lastY = self._lastDrawnPoint
+        # written so that a NaN y counts as visibly new
+        return not (abs(mplDays - lastMplDays) * pixelsPerData[0] < 1 and abs(y - lastY) * pixelsPerData[1] < 1)
+
+    def addPoints(self, yArr, tArr=None):
+        """Append a sequence of data points
+
+        This is much more efficient than calling addPoint for each point.
+
+        Inputs:
+        - yArr: sequence of y values; unlike addPoint, a value of None is not ignored,
+            but is stored as nan (and so shows as a gap in the line)
+        - tArr: sequence of times as POSIX timestamps (e.g. time.time()), the same length as yArr;
+            times must be in increasing order and no earlier than existing data;
+            if None then all points are "now"
+
+        Raise ValueError if tArr is not the same length as yArr, is not in increasing order
+        or starts before the existing data.
+        """
+        yArr = numpy.asarray(yArr, dtype=float)
+        numNew = len(yArr)
+        if tArr is None:
+            mplDaysArr = self._cnvTimeFunc(time.time())
+        else:
+            if len(tArr) != numNew:
+                raise ValueError("tArr has %s elements; must match yArr, which has %s" % (len(tArr), numNew))
+            if hasattr(self._cnvTimeFunc, "batch"):
+                mplDaysArr = self._cnvTimeFunc.batch(tArr)
+            else:
+                mplDaysArr = [self._cnvTimeFunc(t) for t in tArr]
+            mplDaysArr = numpy.asarray(mplDaysArr, dtype=float)
+            if numpy.any(mplDaysArr[1:] < mplDaysArr[:-1]):
+                raise ValueError("tArr must be in increasing order")
+            if numNew > 0 and self._tailInd > self._headInd and mplDaysArr[0] < self._tArr[self._tailInd - 1]:
+                raise ValueError("tArr starts before the existing data")
+        if numNew == 0:
+            return
+
+        if self._tailInd + numNew > len(self._tArr):
+            self._makeRoom(numNew)
+        self._tArr[self._tailInd:self._tailInd + numNew] = mplDaysArr
+        self._yArr[self._tailInd:self._tailInd + numNew] = yArr
+        self._tailInd += numNew
+        if self.subplot._scwDoAutoscale:
+            finiteYArr = yArr[numpy.isfinite(yArr)]
+            if len(finiteYArr) > 0:
+                self._yMin = min(self._yMin, finiteYArr.min())
+                self._yMax = max(self._yMax, finiteYArr.max())
+        self._redrawIfDue(numNew)
     
     def _redraw(self):
         """Redraw the graph
         """
-        self.line2d.set_data(self._tList, self._yList)
-        if not self._wdg.winfo_ismapped():
+        self._numUndrawn = 0
+        if self._tailInd > self._headInd:
+            self._lastDrawnPoint = (self._tArr[self._tailInd - 1], self._yArr[self._tailInd - 1])
+        else:
+            self._lastDrawnPoint = None
+        self._line2DIsCurrent = False
+        if not self._wdg._isVisible:
             return
-        if len(self._yList) > 0:
-            # see if limits need updating to include last point
-            lastY = self._yList[-1]
-            if self.subplot.get_autoscaley_on() and numpy.isfinite(lastY):
-                yMin, yMax = self.subplot.get_ylim()
-                self.line2d.set_data(self._tList, self._yList)
-                if not (yMin <= lastY <= yMax):
-                    self.subplot.relim()
-                    self.subplot.autoscale_view(scalex=False, scaley=True)
-                    return # a draw event was triggered
-
-        # did not trigger redraw event so do it now
-        if self.subplot._scwBackground:
-            canvas = self.subplot.figure.canvas
-            canvas.restore_region(self.subplot._scwBackground)
-            for line in self.subplot._scwLines:
-                self.subplot.draw_artist(line.line2d)
-            canvas.blit(self.subplot.bbox)
+        if self.subplot._scwDoAutoscale and self._yMin <= self._yMax:
+            # see if limits need updating to include all data
+            yMin, yMax = self.subplot._scwYLim
+            if not (yMin <= self._yMin and self._yMax <= yMax):
+                self._wdg._autoscaleY(self.subplot)
+                # the axes must be redrawn; the resulting draw event redraws this line
+                self._wdg.canvas.draw_idle()
+                return
+
+        # the axes are unchanged, so only the lines need to be redrawn
+        self._wdg._scheduleRedraw(self.subplot)
+
+    def _redrawIfDue(self, numNew):
+        """Redraw the graph if drawEveryN points have been added since it was last redrawn
+
+        Inputs:
+        - numNew: number of points just added
+        """
+        self._numUndrawn += numNew
+        if self._numUndrawn >= self._drawEveryN:
+            self._redraw()
 
     def clear(self):
         """Clear all data
         """
-        self._tList = []
-        self._yList = []
+        self._headInd = 0
+        self._tailInd = 0
+        self._yMin = numpy.inf
+        self._yMax = -numpy.inf
         self._redraw()
 
+    def _makeRoom(self, numNew):
+        """Make room for numNew more points after the valid data
+
+        Purge data older than the time range (which would otherwise be purged soon).
+        Then move the valid data to the start of the arrays; if the arrays are more than half full,
+        first replace them with arrays at least twice as large. Thus the cost of moving data
+        is spread over many added points, and memory is bounded by the amount of valid data.
+        """
+        self._purgeOldData(self._wdg._getPurgeMplDays())
+        numPts = self._tailInd - self._headInd
+        bufSize = len(self._tArr)
+        while bufSize < 2 * (numPts + numNew):
+            bufSize *= 2
+        if bufSize > len(self._tArr):
+            tArr = numpy.zeros(bufSize, dtype=float)
+            yArr = numpy.zeros(bufSize, dtype=float)
+        else:
+            tArr = self._tArr
+            yArr = self._yArr
+        tArr[0:numPts] = self._tArr[self._headInd:self._tailInd]
+        yArr[0:numPts] = self._yArr[self._headInd:self._tailInd]
+        self._tArr = tArr
+        self._yArr = yArr
+        self._headInd = 0
+        self._tailInd = numPts
+        # the data has moved, so the Line2D's views are no longer valid
+        self._line2DIsCurrent = False
+
+    def _updateLine2D(self):
+        """Set the data of the matplotlib Line2D from the valid data, if not already done
+
+        Call just before drawing the line.
+
+        If there are more than four points per time bin, where a bin is one pixel of subplot width,
+        the Line2D is given the min and max of each non-empty bin (ignoring nan),
+        plotted at the time of the first point in the bin, followed by the last point;
+        this preserves the appearance of the line but greatly reduces the cost of drawing it.
+        Otherwise the Line2D is given views of the valid data (not copies).
+        """
+        if self._line2DIsCurrent:
+            return
+        tArr = self._tArr[self._headInd:self._tailInd]
+        yArr = self._yArr[self._headInd:self._tailInd]
+        numPts = len(tArr)
+        numPixels = int(self.subplot.bbox.width)
+        if numPixels > 0 and numPts > 1:
+            binWidth = self.subplot.viewLim.width / float(numPixels)
+            if binWidth > 0 and 4 * (tArr[-1] - tArr[0]) / binWidth < numPts:
+                edgeTArr = numpy.arange(tArr[0], tArr[-1], binWidth)
+                binStartArr = numpy.unique(numpy.searchsorted(tArr, edgeTArr)) # omit empty bins
+                numBins = len(binStartArr)
+                envelopeTArr = numpy.empty(2 * numBins + 1, dtype=float)
+                envelopeTArr[0:-1] = numpy.repeat(tArr[binStartArr], 2)
+                envelopeTArr[-1] = tArr[-1]
+                envelopeYArr = numpy.empty(2 * numBins + 1, dtype=float)
+                envelopeYArr[0:-1:2] = numpy.fmin.reduceat(yArr, binStartArr)
+                envelopeYArr[1:-1:2] = numpy.fmax.reduceat(yArr, binStartArr)
+                envelopeYArr[-1] = yArr[-1]
+                tArr = envelopeTArr
+                yArr = envelopeYArr
+        self.line2d.set_data(tArr, yArr)
+        self._line2DIsCurrent = True
+
     def _purgeOldData(self, minMplDays):
         """Purge data with t < minMplDays
 
@@ -446,13 +901,81 @@ class _Line(object):
         
         Warning: does not update the display (the caller must do that)
         """
-        if not self._tList:
+        if self._tailInd <= self._headInd:
             return
-        numToDitch = bisect.bisect_left(self._tList, minMplDays) - 1 # -1 avoids a gap at the left
+        numToDitch = int(numpy.searchsorted(self._tArr[self._headInd:self._tailInd], minMplDays)) - 1
+            # -1 avoids a gap at the left
         if numToDitch > 0:
-            self._tList = self._tList[numToDitch:]
-            self._yList = self._yList[numToDitch:]
-            self.line2d.set_data(self._tList, self._yList)
+            if self.subplot._scwDoAutoscale:
+                # the y range only changes if a purged value was at one of its limits
+                ditchedYArr = self._yArr[self._headInd:self._headInd + numToDitch]
+                needYRange = numpy.any((ditchedYArr <= self._yMin) | (ditchedYArr >= self._yMax))
+            else:
+                needYRange = False
+            self._headInd += numToDitch
+            if needYRange:
+                self._updateYRange()
+            self._line2DIsCurrent = False
+
+    def _updateYRange(self):
+        """Compute _yMin and _yMax from the valid data
+        """
+        yArr = self._yArr[self._headInd:self._tailInd]
+        yArr = yArr[numpy.isfinite(yArr)]
+        if len(yArr) > 0:
+            self._yMin = yArr.min()
+            self._yMax = yArr.max()
+        else:
+            self._yMin = numpy.inf
+            self._yMax = -numpy.inf
+
+
+def _purgeDeadTransformRefs(nodeList):
+    """Remove dead weak references to parents from matplotlib transforms
+
+    Some versions of matplotlib (at least 1.4 through 2.2.3) record the parents of each transform node
+    as a dict of weak references, but never remove the references when the parents die,
+    so a long-lived transform accumulates dead references to the many short-lived transforms
+    made while drawing. Other versions do not need this, and nothing is changed.
+
+    Inputs:
+    - nodeList: matplotlib transforms and bboxes (TransformNode instances) at which to start;
+        all transform nodes they refer to (directly or indirectly) are also purged
+    """
+    nodesToDo = list(nodeList)
+    doneIDSet = set()
+    while nodesToDo:
+        node = nodesToDo.pop()
+        if id(node) in doneIDSet:
+            continue
+        doneIDSet.add(id(node))
+        parents = getattr(node, "_parents", None)
+        if type(parents) is dict:
+            deadKeyList = [key for key, ref in parents.items() if callable(ref) and ref() is None]
+            for key in deadKeyList:
+                del parents[key]
+        for value in vars(node).values():
+            if isinstance(value, matplotlib.transforms.TransformNode):
+                nodesToDo.append(value)
+
+def _isFinite(y):
+    """Return True if the scalar y is finite (neither infinite nor NaN)
+
+    Much faster than numpy.isfinite for a scalar; math.isfinite requires Python 3.2.
+    """
+    return -_Inf < y < _Inf
+
+def _formatHMS(mplDays, pos=None):
+    """Format matplotlib days as "HH:MM:SS"
+
+    This gives the same result as matplotlib.dates.DateFormatter("%H:%M:%S") (with UTC as the timezone)
+    but avoids creating a datetime object. Like DateFormatter, rounds to the nearest microsecond
+    and then truncates to the second.
+    """
+    secOfDay = int(round((mplDays % 1.0) * _SecPerDay, 6)) % _SecPerDay
+    hours, secOfHour = divmod(secOfDay, 3600)
+    minutes, seconds = divmod(secOfHour, 60)
+    return "%02d:%02d:%02d" % (hours, minutes, seconds)
 
 
 class TimeConverter(object):
@@ -475,11 +998,21 @@ class TimeConverter(object):
             d = datetime.datetime.fromtimestamp(unixSec)
         matplotlibDays = matplotlib.dates.date2num(d)
         self.mplSecMinusUnixSec = (matplotlibDays / self._DaysPerSecond) - unixSec
+        # matplotlib days = unixSec * self._scale + self._bias
+        self._scale = self._DaysPerSecond
+        self._bias = (self._offset + self.mplSecMinusUnixSec) * self._DaysPerSecond
             
     def __call__(self, unixSec):
         """Given a a POSIX timestamp (e.g. from time.time()) return matplotlib days
+
+        unixSec may also be a numpy array of timestamps, in which case an array is returned.
+        """
+        return unixSec * self._scale + self._bias
+
+    def batch(self, unixSecArr):
+        """Given a sequence of POSIX timestamps return a numpy array of matplotlib days
         """
-        return (unixSec + self._offset + self.mplSecMinusUnixSec) * self._DaysPerSecond
+        return numpy.asarray(unixSecArr, dtype=float) * self._scale + self._bias
 
 
 if __name__ == "__main__":   
@@ -62,11 +62,15 @@ History:
 2015-09-24 ROwen    Replace "== None" with "is None" to modernize the code.
 2015-10-23 ROwen    getNames now ignores case when sorting names.
 2015-11-03 ROwen    Replace "!= None" with "is not None" to modernize the code.
+2026-10-16 agent    Improve performance of ToplevelSet.readGeomVisFile and writeGeomVisFile;
+                    writeGeomVisFile does not rewrite an unchanged file it just read.
+                    Debug output is enabled by _DEBUG; removed unused Toplevel.__printInfo.
 """
 __all__ = ['tl_CloseDestroys', 'tl_CloseWithdraws', 'tl_CloseDisabled', 'Toplevel', 'ToplevelSet']
 
 import json
 import os.path
+import re
 import sys
 import traceback
 import Tkinter
@@ -81,6 +85,15 @@ tl_CloseDestroys = 0
 tl_CloseWithdraws = 1
 tl_CloseDisabled = 2
 
+_DEBUG = False # print debugging information?
+
+# visibility values as written by ToplevelSet.writeGeomVisFile; other values are parsed by RO.CnvUtil.asBool
+_VisStrDict = {"True": True, "False": False}
+
+# a data line of a geometry file: name = geometry[, isVisible[, stateDict]]; see ToplevelSet.readGeomVisFile;
+# lines that start with "#" are comments; values are not stripped of whitespace
+_GeomVisLineRE = re.compile(r"^(?!#)(?P<name>[^=]*)=(?P<geom>[^,]*)(?:,(?P<vis>[^,]*)(?:,(?P<state>.*))?)?$")
+
 class Toplevel(Tkinter.Toplevel):
     def __init__(self,
         master=None,
@@ -133,13 +146,16 @@ class Toplevel(Tkinter.Toplevel):
         self.__wdg = None  # contained widget, but only if wdgFunc specified
         self._reportedBadPosition = False
         self._defState = {}
+        self._defStateStr = None # json encoding of self._defState; see _getDefStateStr
         self._stateTracker = None
+        self.__recordGeometryID = None # ID of pending after_idle call to record geometry, or None
+        self._doSaveState = False # cached value of self._stateTracker is not None
 
         if title:
             self.wm_title(title)
         self.wm_resizable(*resizable)
         
-        self.bind("<Unmap>", self.__recordGeometry)
+        self.bind("<Unmap>", self.__recordGeometryWhenIdle)
         self.bind("<Destroy>", self.__recordGeometry)
         
         # handle special close modes
@@ -167,6 +183,7 @@ class Toplevel(Tkinter.Toplevel):
                 self._stateTracker = self.__wdg.getStateTracker()
                 if self._stateTracker is None:
                     raise RuntimeError("getStateTracker returned None")
+                self._doSaveState = True
                     
             
         elif doSaveState:
@@ -207,24 +224,33 @@ class Toplevel(Tkinter.Toplevel):
         - sets only position information if window is self-sizing
         - records the new geometry (including size information, even if window is self-sizing)
         """
-        #print "%s.setGeometry(%s)" % (self, geomStr,)
+        if _DEBUG:
+            print("%s.setGeometry(%s)" % (self, geomStr,))
         if not geomStr:
             return
         geom = RO.TkUtil.Geometry.fromTkStr(geomStr).constrained()
         if self.__canResize:
-            includeExtent = None # supply if available, else omit
+            constrainedGeomStr = geom.toTkStr(includeExtent=None) # include extent if available, else omit
         else:
-            includeExtent = False
-        constrainedGeomStr = geom.toTkStr(includeExtent=includeExtent)
-        #print "%s.setGeometry: constrained geometry = %s" % (self, constrainedGeomStr)
+            constrainedGeomStr = geom.toTkStr(includeExtent=False)
+        if _DEBUG:
+            print("%s.setGeometry: constrained geometry = %s" % (self, constrainedGeomStr))
         self.geometry(constrainedGeomStr)
         if not self.getVisible():
-            self.__geometry = geom.toTkStr(includeExtent=None)
+            if self.__canResize:
+                self.__geometry = constrainedGeomStr
+            else:
+                self.__geometry = geom.toTkStr(includeExtent=None)
     
     def __recordGeometry(self, evt=None):
         """Record the current geometry of the window.
         """
-        #print "%s.__recordGeometry; geom=%s" % (self, self.geometry())
+        if _DEBUG:
+            print("%s.__recordGeometry; geom=%s" % (self, self.geometry()))
+        if self.__recordGeometryID is not None:
+            # no need for the pending call (and it would fail if the window is being destroyed)
+            self.after_cancel(self.__recordGeometryID)
+            self.__recordGeometryID = None
         if self.winfo_y() < 0:
             if not self._reportedBadPosition:
                 self._reportedBadPosition = True
@@ -234,16 +260,30 @@ class Toplevel(Tkinter.Toplevel):
         self.__geometry = self.geometry()
         self._reportedBadPosition = False
     
+    def __recordGeometryWhenIdle(self, evt=None):
+        """Record the current geometry of the window when Tk is next idle.
+
+        Use as the binding for <Unmap>, since several such events may occur in a row.
+        """
+        if self.__recordGeometryID is None:
+            self.__recordGeometryID = self.after_idle(self.__recordPendingGeometry)
+
+    def __recordPendingGeometry(self):
+        """Record the current geometry of the window, as requested by __recordGeometryWhenIdle
+        """
+        self.__recordGeometryID = None
+        self.__recordGeometry()
+
     def __adjWidth(self, evt=None):
         """Update geometry to shrink-to-fit width and user-requested height
         
         Use as the binding for <Configure> if resizable = (True, False).
         """
-        height = self.winfo_height()
+        width, height = self.__getSize(evt)
         if height < 2:
             return
         reqwidth = self.winfo_reqwidth()
-        if self.winfo_width() != reqwidth:
+        if width != reqwidth:
             self.geometry("%sx%s" % (reqwidth, height))
     
     def __adjHeight(self, evt=None):
@@ -251,12 +291,22 @@ class Toplevel(Tkinter.Toplevel):
         
         Use as the binding for <Configure> if resizable = (False, True).
         """
-        width = self.winfo_width()
+        width, height = self.__getSize(evt)
         if width < 2:
             return
         reqheight = self.winfo_reqheight()
-        if self.winfo_height() != reqheight:
+        if height != reqheight:
             self.geometry("%sx%s" % (width, reqheight))
+
+    def __getSize(self, evt=None):
+        """Return the current (width, height) of the window
+
+        Use the size in evt if it is a <Configure> event for this toplevel (saving two calls to Tk);
+        the bindings also see <Configure> events for the contained widgets.
+        """
+        if evt is not None and evt.widget is self:
+            return evt.width, evt.height
+        return self.winfo_width(), self.winfo_height()
     
     def getVisible(self):
         """Returns True if the window is visible, False otherwise
@@ -281,7 +331,7 @@ class Toplevel(Tkinter.Toplevel):
     def getDoSaveState(self):
         """Returns True if saving state
         """
-        return self._stateTracker is not None
+        return self._doSaveState
     
     def getStateIsDefault(self):
         """Returns the state dictionary of the underlying widget and a flag indicating if default
@@ -297,9 +347,19 @@ class Toplevel(Tkinter.Toplevel):
             raise RuntimeError("Not saving state")
         stateDict = self._stateTracker.getState()
         isDefault = stateDict == self._defState
-#         print "getStateIsDefault: stateDict=%s, self._defState=%s, isDefault=%s" % (stateDict, self._defState, isDefault)
+        if _DEBUG:
+            print("getStateIsDefault: stateDict=%s, self._defState=%s, isDefault=%s" % (stateDict, self._defState, isDefault))
         return stateDict, isDefault
 
+    def _getDefStateStr(self):
+        """Return the default state dictionary encoded as json
+
+        The encoding is computed once, since the default state does not change.
+        """
+        if self._defStateStr is None:
+            self._defStateStr = json.dumps(self._defState)
+        return self._defStateStr
+
     def setState(self, stateDict):
         """Set the state dictionary of the underlying widget
         
@@ -329,14 +389,6 @@ class Toplevel(Tkinter.Toplevel):
             self.wm_deiconify()
             self.lift()
     
-    def __printInfo(self):
-        """A debugging tool prints info to the main window"""
-        print("info for RO.Wdg.Toplevel %s" % self.wm_title())
-        print("getGeometry = %r" % (self.getGeometry(),))
-        print("geometry = %r" % (self.geometry()))
-        print("width, height = %r, %r" % (self.winfo_width(), self.winfo_height()))
-        print("req width, req height = %r, %r" % (self.winfo_reqwidth(), self.winfo_reqheight()))
-
     def __str__(self):
         return "Toplevel(%s)" % (self.wm_title(),)
 
@@ -375,17 +427,15 @@ class ToplevelSet(object):
         self.fileGeomDict = {}
         self.fileVisDict = {}
         self.fileState = {}
-        self.defGeomDict = {}
-        self.defVisDict = {}
         if defGeomVisDict:
-            for name, geomVis in defGeomVisDict.iteritems():
-                geom, vis = geomVis
-                if geom:
-                    self.defGeomDict[name] = geom
-                if vis:
-                    self.defVisDict[name] = vis
+            self.defGeomDict = {name: geom for name, (geom, vis) in defGeomVisDict.iteritems() if geom}
+            self.defVisDict = {name: vis for name, (geom, vis) in defGeomVisDict.iteritems() if vis}
+        else:
+            self.defGeomDict = {}
+            self.defVisDict = {}
 
         self.tlDict = {}    # dictionary of name:toplevel items
+        self.__fileContents = None # (file name, contents) of the geometry file last read
         if self.defFileName:
             self.readGeomVisFile(fileName, createFile)
     
@@ -439,17 +489,19 @@ class ToplevelSet(object):
         kargs["visible"] = self.getDesVisible(name)
         if "title" not in kargs:
             kargs["title"] = name.split(".")[-1]
-        #print "ToplevelSet is creating %r with master = %r, geom= %r, kargs = %r" % (name, master, geom, kargs)
+        if _DEBUG:
+            print("ToplevelSet is creating %r with master = %r, geom= %r, kargs = %r" % (name, master, geom, kargs))
         newToplevel = Toplevel(master, geom, **kargs)
         
         # restore state, if appropriate
         if newToplevel.getDoSaveState():
             stateDict = self.fileState.get(name)
             if stateDict is not None:
-#                 print "restoring state for Toplevel %s: %s" % (name, stateDict)
+                if _DEBUG:
+                    print("restoring state for Toplevel %s: %s" % (name, stateDict))
                 newToplevel.setState(stateDict)
-#             else:
-#                 print "no saved state for Toplevel %s" % (name,)
+            elif _DEBUG:
+                print("no saved state for Toplevel %s" % (name,))
             
         self.tlDict[name] = newToplevel
         return newToplevel
@@ -555,53 +607,52 @@ class ToplevelSet(object):
             inFile = RO.OS.openUniv(fileName)
         except Exception as e:
             raise RuntimeError("Could not open geometry file %r; error: %s\n" % (fileName, RO.StringUtil.strFromException(e)))
+        try:
+            fileContents = inFile.read()
+        finally:
+            inFile.close()
+        self.__fileContents = (fileName, fileContents)
+        lineList = fileContents.splitlines()
             
         newGeomDict = {}
         newVisDict = {}
         newState = {}
-        try:
-            for ind, line in enumerate(inFile):
-                # if line starts with #, it is a comment, skip it
-                if line.startswith("#"):
-                    continue
-                data = line.split("=", 1)
-                if len(data) < 2:
-                    # no data on this line; skip it
-                    continue
-                name = data[0].strip()
-                if len(name) == 0:
-                    continue
-
-                geomVisList = data[1].split(",", 2)
-                if len(geomVisList) == 0:
-                    continue
-
-                geom = geomVisList[0].strip()
-                if geom:
-                    newGeomDict[name] = geom
-
-                if len(geomVisList) > 1:
-                    vis = geomVisList[1].strip()
-                    if vis:
-                        vis = RO.CnvUtil.asBool(vis)
-                        newVisDict[name] = vis
-                
-                if len(geomVisList) > 2:
-                    stateDictStr = geomVisList[2].strip()
-                    if stateDictStr:
-                        try:
-                            stateDict = json.loads(stateDictStr)
-                            newState[name] = stateDict
-                        except Exception as e:
-                            sys.stderr.write("Error reading line %d of geometry file %s: %s" % (ind+1, fileName, line))
-                            sys.stderr.write("  failed to parse state: %r\n" % (stateDictStr,))
-                            sys.stderr.write("  error: %s\n" % (RO.StringUtil.strFromException(e),))
-
-            self.fileGeomDict = newGeomDict
-            self.fileVisDict = newVisDict
-            self.fileState = newState
-        finally:
-            inFile.close()
+        for ind, line in enumerate(lineList):
+            match = _GeomVisLineRE.match(line)
+            if not match:
+                # comment or no data on this line; skip it
+                continue
+            name, geom, vis, stateDictStr = match.group("name", "geom", "vis", "state")
+            name = name.strip()
+            if len(name) == 0:
+                continue
+
+            geom = geom.strip()
+            if geom:
+                newGeomDict[name] = geom
+
+            if vis is not None:
+                vis = vis.strip()
+                if vis:
+                    boolVis = _VisStrDict.get(vis)
+                    if boolVis is None:
+                        boolVis = RO.CnvUtil.asBool(vis)
+                    newVisDict[name] = boolVis
+            
+            if stateDictStr is not None:
+                stateDictStr = stateDictStr.strip()
+                if stateDictStr:
+                    try:
+                        stateDict = json.loads(stateDictStr)
+                        newState[name] = stateDict
+                    except Exception as e:
+                        sys.stderr.write("Error reading line %d of geometry file %s: %s\n" \
+                            "  failed to parse state: %r\n" \
+                            "  error: %s\n" % (ind+1, fileName, line, stateDictStr, RO.StringUtil.strFromException(e)))
+
+        self.fileGeomDict = newGeomDict
+        self.fileVisDict = newVisDict
+        self.fileState = newState
         
     def writeGeomVisFile(self, fileName=None, readFirst = True):
         """Writes toplevel geometry and visiblity info to a file
@@ -612,60 +663,82 @@ class ToplevelSet(object):
         Inputs:
         - fileName: full path name of geometry file
         - readFirst: read the geometry file first (if it exists) to be sure of having
-          a current set of defaults (affects which entries will be commented out)
+          a current set of defaults (affects which entries will be commented out);
+          also, if True, the file is not rewritten if its contents would not change
         """
         fileName = fileName or self.defFileName
         if not fileName:
             raise RuntimeError("No geometry file specified and no default")
         
+        self.__fileContents = None
         if readFirst and os.path.isfile(fileName):
             self.readGeomVisFile(fileName)
 
+        lineList = []
+        deadNameList = []
+        defGeomDict = self.defGeomDict
+        defVisDict = self.defVisDict
+        fileGeomDict = self.fileGeomDict
+        fileVisDict = self.fileVisDict
+        fileState = self.fileState
+        for name, tl in sorted(self.tlDict.items()):
+            defGeom = defGeomDict.get(name, "")
+            defVis = defVisDict.get(name, None)
+            doSaveState = False
+            currState = {}
+            isDefaultState = True
+            
+            if tl and tl.winfo_exists():
+                currGeom = tl.getGeometry() or defGeom # getGeometry may return "" if window never displayed
+                currVis = tl.getVisible()
+                doSaveState = tl.getDoSaveState()
+                if doSaveState:
+                    currState, isDefaultState = tl.getStateIsDefault()
+                    if _DEBUG:
+                        print("for Toplevel %s: isDefaultState=%s, currState=%s" % (name, isDefaultState, currState))
+            else:
+                # Unknown toplevel (e.g. a script window)
+                deadNameList.append(name)
+                currGeom = defGeom
+                currVis = False
+            isDefaultGeom = currGeom == defGeom
+            isDefaultVis = currVis == defVis
+            
+            # record current values in file dictionaries (to match the file we're writing)
+            fileGeomDict[name] = currGeom
+            fileVisDict[name] = currVis
+            fileState[name] = currState
+            
+            valueList = [currGeom, str(currVis)]
+            if doSaveState:
+                if isDefaultState:
+                    valueList.append(tl._getDefStateStr())
+                else:
+                    valueList.append(json.dumps(currState))
+                
+            # comment out entry if all values are default
+            if isDefaultGeom and isDefaultVis and isDefaultState:
+                prefixStr = "# "
+            else:
+                prefixStr = ""
+            lineList.append("%s%s = %s\n" % (prefixStr, name, ", ".join(valueList)))
+        for name in deadNameList:
+            # same as getToplevel
+            del self.tlDict[name]
+
+        fileContents = "".join(lineList)
+
+        if self.__fileContents == (fileName, fileContents):
+            # the file was just read and already has these contents
+            return
+
         try:
             outFile = open(fileName, "w")
         except Exception as e:
             raise RuntimeError("Could not open geometry file %r; error: %s\n" % (fileName, RO.StringUtil.strFromException(e)))
             
         try:
-            names = self.getNames()
-            names.sort()
-            for name in names:
-                defGeom = self.defGeomDict.get(name, "")
-                defVis = self.defVisDict.get(name, None)
-                doSaveState = False
-                currState = {}
-                isDefaultState = True
-                
-                tl = self.getToplevel(name)
-                if tl:
-                    currGeom = tl.getGeometry() or defGeom # getGeometry may return "" if window never displayed
-                    currVis = tl.getVisible()
-                    doSaveState = tl.getDoSaveState()
-                    if doSaveState:
-                        currState, isDefaultState = tl.getStateIsDefault()
-#                         print "for Toplevel %s: isDefaultState=%s, currState=%s" % (name, isDefaultState, currState)
-                else:
-                    # Unknown toplevel (e.g. a script window)
-                    currGeom = defGeom
-                    currVis = False
-                isDefaultGeom = currGeom == defGeom
-                isDefaultVis = currVis == defVis
-                
-                # record current values in file dictionaries (to match the file we're writing)
-                self.fileGeomDict[name] = currGeom
-                self.fileVisDict[name] = currVis
-                self.fileState[name] = currState
-                
-                valueList = [currGeom, str(currVis)]
-                if doSaveState:
-                    valueList.append(json.dumps(currState))
-                    
-                # comment out entry if all values are default
-                if isDefaultGeom and isDefaultVis and isDefaultState:
-                    prefixStr = "# "
-                else:
-                    prefixStr = ""
-                outFile.write("%s%s = %s\n" % (prefixStr, name, ", ".join(valueList)))
+            outFile.write(fileContents)
         finally:
             outFile.close()
 
@@ -684,9 +757,14 @@ if __name__ == "__main__":
     
     def printInfo():
         print("testWin.getGeometry = %r" % (testWin.getGeometry(),))
-        print("geometry = %r" % (testWin.geometry()))
-        print("width, height = %r, %r" % (testWin.winfo_width(), testWin.winfo_height()))
-        print("req width, req height = %r, %r" % (testWin.winfo_reqwidth(), testWin.winfo_reqheight()))
+        # get the remaining information with a single call to Tcl
+        w = testWin._w
+        infoStr = testWin.tk.eval("list [wm geometry %s] [winfo width %s] [winfo height %s] [winfo reqwidth %s] [winfo reqheight %s]" \
+            % (w, w, w, w, w))
+        geomStr, width, height, reqWidth, reqHeight = testWin.tk.splitlist(infoStr)
+        print("geometry = %r" % (geomStr,))
+        print("width, height = %r, %r" % (int(width), int(height)))
+        print("req width, req height = %r, %r" % (int(reqWidth), int(reqHeight)))
         print("")
     
     b = Tkinter.Button(root, text="Window Info", command=printInfo)
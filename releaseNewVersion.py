@@ -22,18 +22,17 @@ versOK = raw_input(queryStr)
 if not versOK.lower() == "y":
     sys.exit(0)
 
-versRegEx = re.compile(r"<h3>(\d.*?)\s+\d\d\d\d-\d\d-\d\d</h3>")
-with file(os.path.join("docs", "VersionHistory.html")) as vhist:
-    for line in vhist:
-        versMatch = versRegEx.match(line)
-        if versMatch:
-            histVersStr = versMatch.groups()[0]
-            if histVersStr == Version.__version__:
-                print("Version in VersionHistory.html matches")
-                break
-            else:
-                print("Error: version in VersionHistory.html = %s != %s" % (histVersStr, Version.__version__))
-                sys.exit(0)
+# match the first line that starts with a version header
+versRegEx = re.compile(r"^<h3>(\d.*?)\s+\d\d\d\d-\d\d-\d\d</h3>", re.MULTILINE)
+with open(os.path.join("docs", "VersionHistory.html")) as vhist:
+    versMatch = versRegEx.search(vhist.read())
+if versMatch:
+    histVersStr = versMatch.groups()[0]
+    if histVersStr == Version.__version__:
+        print("Version in VersionHistory.html matches")
+    else:
+        print("Error: version in VersionHistory.html = %s != %s" % (histVersStr, Version.__version__))
+        sys.exit(0)
 
 print("Status of git repository:")
 
@@ -13,7 +13,8 @@ Port = 2210
 class TestRunner(object):
     def __init__(self, sendRcvList, binaryServer=False):
         self.binaryServer = bool(binaryServer)
-        self.sendRcvListIter = iter(sendRcvList)
+        self.sendRcvList = tuple(sendRcvList)
+        self.sendRcvInd = 0 # index of next item of sendRcvList
         self.deferred = Deferred()
         self.endState = None
         self.clientSocket = None
@@ -104,11 +105,11 @@ class TestRunner(object):
         )
 
     def writeNext(self):
-        try:
-            writeData, writeLine, self.readData, self.readLine = next(self.sendRcvListIter)
-        except StopIteration:
+        if self.sendRcvInd >= len(self.sendRcvList):
             self.end(isOK=True)
             return
+        writeData, writeLine, self.readData, self.readLine = self.sendRcvList[self.sendRcvInd]
+        self.sendRcvInd += 1
 
         if writeData is not None:
             if writeLine:
@@ -0,0 +1,23 @@
+# -*- test-case-name: tests.Wdg.testStripChartWdg -*-
+from __future__ import absolute_import, division, print_function
+import random
+from twisted.trial import unittest
+import matplotlib.dates
+from RO.Wdg.StripChartWdg import _formatHMS
+
+SecPerDay = 24 * 60 * 60
+
+class TestFormatHMS(unittest.TestCase):
+    def testMatchesDateFormatter(self):
+        """Test that _formatHMS matches DateFormatter("%H:%M:%S") with UTC as the timezone
+        """
+        dateFormatter = matplotlib.dates.DateFormatter("%H:%M:%S", tz=matplotlib.dates.UTC)
+        baseMplDays = 2.0 # a date that is valid for any matplotlib date epoch
+        mplDaysList = [baseMplDays + sec / SecPerDay for sec in (0, 0.4e-6, 0.6e-6, 1, 59.9999994, 59.9999996,
+            3599.5, 43200, 86399, 86399.5)]
+        # just before midnight
+        mplDaysList += [baseMplDays + 1 - sec / SecPerDay for sec in (0.1e-6, 0.4e-6, 0.6e-6, 1e-6, 1e-3, 0.5, 1)]
+        rand = random.Random(1)
+        mplDaysList += [baseMplDays + rand.random() for i in range(1000)]
+        for mplDays in mplDaysList:
+            self.assertEqual(_formatHMS(mplDays), dateFormatter(mplDays), "mplDays=%r" % (mplDays,))
@@ -0,0 +1,54 @@
+# -*- test-case-name: tests.Wdg.testToplevel -*-
+from __future__ import absolute_import, division, print_function
+from twisted.trial import unittest
+from RO.Wdg.Toplevel import _GeomVisLineRE
+
+def splitGeomVisLine(line):
+    """Split a geometry file line as ToplevelSet.readGeomVisFile did before it used _GeomVisLineRE
+    
+    Return (name, geom, vis, state) (unstripped, vis and state None if absent), or None if no data
+    """
+    if line.startswith("#"):
+        return None
+    data = line.split("=", 1)
+    if len(data) < 2:
+        return None
+    geomVisList = data[1].split(",", 2) + [None, None]
+    return (data[0], geomVisList[0], geomVisList[1], geomVisList[2])
+
+class TestGeomVisLineRE(unittest.TestCase):
+    def testMatchesSplit(self):
+        """Test that _GeomVisLineRE splits lines the same way as str.split
+        """
+        lineList = (
+            "",
+            " ",
+            "#",
+            "# name = 20x30+5+6, True",
+            " # indented comment = 20x30+5+6",
+            "no equals sign",
+            "no equals, but, commas",
+            "=",
+            "name =",
+            "name = ",
+            " = 20x30+5+6",
+            "name = 20x30+5+6",
+            "name = +5+6, False",
+            "name = 20x30-5-6, True, {}",
+            "name=20x30+5+6,True,{}",
+            "name = ,,",
+            "name = , , ",
+            "name = 20x30+5+6,, {}",
+            "name = 20x30+5+6, True, {\"a\": [1, 2], \"b\": \"x=y\"}",
+            "name = 20x30+5+6, True, {}, extra, commas",
+            "name = geom=with=equals, True",
+            "name.sub = 20x30+5+6 , 1 ",
+            "name\t=\t20x30+5+6\t,\tTrue",
+        )
+        for line in lineList:
+            match = _GeomVisLineRE.match(line)
+            if match:
+                fields = match.group("name", "geom", "vis", "state")
+            else:
+                fields = None
+            self.assertEqual(fields, splitGeomVisLine(line), "line=%r" % (line,))
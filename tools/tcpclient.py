@@ -4,6 +4,7 @@ from __future__ import absolute_import, division, print_function
 
 History:
 2009-07-10 ROwen    Removed an inline conditional statement to be Python 2.4 compatible.
+2026-10-16 agent    Add messages to the log in batches, when Tk is idle.
 """
 import sys
 import Tkinter
@@ -15,6 +16,7 @@ import RO.Wdg
 class TCPClient(Tkinter.Frame):
     def __init__(self, master, addr, port=None):
         Tkinter.Frame.__init__(self, master)
+        self._pendingMsgList = [] # messages not yet added to the log; see logMsg
         self.logWdg = RO.Wdg.LogWdg(
             master = self,
             maxLines = 1000,
@@ -58,8 +60,18 @@ class TCPClient(Tkinter.Frame):
         self.conn.writeLine(cmd)
     
     def logMsg(self, msg):
-        """Append msg to log, with terminating \n"""
-        self.logWdg.addOutput(msg + "\n")
+        """Append msg to log, with terminating \n
+
+        The message is added when Tk is next idle, so a burst of messages updates the log once.
+        """
+        if not self._pendingMsgList:
+            self.after_idle(self._flushLog)
+        self._pendingMsgList.append(msg)
+
+    def _flushLog(self):
+        """Add pending messages to the log"""
+        msgList, self._pendingMsgList = self._pendingMsgList, []
+        self.logWdg.addOutput("".join(msg + "\n" for msg in msgList))
 
 
 if __name__ == "__main__":